@@ -0,0 +1,23 @@
+"""
+JSON encoding/decoding that uses ``orjson`` when it is installed and the standard library otherwise.
+"""
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+if orjson is not None:
+    loads = orjson.loads
+
+    def dumps(value) -> bytes:
+        # the standard library also writes non-string keys (e.g. ints) as strings
+        return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS)
+
+else:  # pragma: no cover
+    import json
+
+    loads = json.loads
+
+    def dumps(value) -> bytes:
+        return json.dumps(value, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
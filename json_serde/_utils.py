@@ -2,12 +2,10 @@ class AbsentType:
 
     """Type to represent a missing value where ``None`` would be ambiguous."""
 
-    __INSTANCE = None
+    __slots__ = ()
 
     def __new__(cls):
-        if cls.__INSTANCE is None:
-            cls.__INSTANCE = super().__new__(cls)
-        return cls.__INSTANCE
+        return Absent
 
     def __bool__(self) -> bool:
         return False
@@ -19,5 +17,5 @@ class AbsentType:
         return repr(self)
 
 
-Absent = AbsentType()
-Absent.__doc__ = AbsentType.__doc__
+# the one instance, created directly so ``AbsentType()`` can simply hand it back
+Absent = object.__new__(AbsentType)
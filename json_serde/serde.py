@@ -4,13 +4,19 @@
 De/Serialization classes.
 """
 
-import hashlib
+import functools
+import itertools
 import linecache
+import operator
+import os
+import re
+import sys
 
-from collections import OrderedDict
-from datetime import datetime, timezone, date
+from collections.abc import Mapping
+from datetime import datetime, timedelta, timezone, date
 from uuid import UUID
 
+from ._fastjson import dumps, loads
 from ._utils import Absent
 
 
@@ -23,6 +29,171 @@ class SerdeError(Exception):
     pass
 
 
+# numbers the filenames of generated source registered with ``linecache``
+_SOURCE_COUNTER = itertools.count()
+
+
+def _compile_function(name: str, kind: str, lines: list, variables: dict) -> callable:
+    """Compile generated source and return the function ``name`` defined by it.
+
+    The function is defined inside a factory taking ``variables`` as arguments, so the names it
+    uses are closure variables rather than globals.
+
+    The source is only registered with ``linecache`` (so that it shows up in tracebacks and
+    debuggers) when the ``JSON_SERDE_DEBUG`` environment variable is set.
+    """
+    body = "\n".join(lines).splitlines()
+    lines = (
+        ["def __create_fn__({}):".format(", ".join(sorted(variables)))]
+        + ["    " + line for line in body]
+        + ["    return {}".format(name)]
+    )
+    source = "\n".join(lines)
+    if os.environ.get("JSON_SERDE_DEBUG"):
+        filename = "<json_serde {} {}>".format(kind, next(_SOURCE_COUNTER))
+        linecache.cache[filename] = (len(source), None, source.splitlines(True), filename)
+    else:
+        filename = "<json_serde {}>".format(kind)
+
+    locs = {}
+    eval(_compile_source(source, filename), {}, locs)  # nosec
+    return locs["__create_fn__"](**variables)
+
+
+@functools.lru_cache(maxsize=256)
+def _compile_source(source: str, filename: str):
+    """Classes with the same shape generate the same source, so share the code objects."""
+    return compile(source, filename, "exec")
+
+
+_UTC = timezone.utc
+
+# ``date.fromisoformat`` and ``datetime.fromisoformat`` are new in Python 3.7
+_HAS_FROMISOFORMAT = hasattr(date, "fromisoformat")
+
+# Python 3.11+ ``datetime.fromisoformat`` accepts 'Z', '±hhmm' and any number of fractional digits
+_FROMISOFORMAT_ANY_OFFSET = sys.version_info >= (3, 11)
+
+_call_to_json = operator.methodcaller("to_json")
+
+# UTC offset in minutes -> ``timezone`` so bulk parsing doesn't allocate one per timestamp
+_TZ_CACHE = {0: _UTC}
+
+# every timestamp form ``IsoDateTime`` accepts, including single digit date and time parts
+_ISO_DATETIME_RE = re.compile(
+    r"(\d{4})-(\d{1,2})-(\d{1,2})T(\d{1,2}):(\d{1,2}):(\d{1,2})(?:\.(\d{1,6}))?"
+    r"(?:Z|([+-])(\d{2}):?([0-5]\d))"
+)
+
+
+def _get_tz(sign: str, hours: str, minutes: str) -> timezone:
+    offset = int(hours) * 60 + int(minutes)
+    if sign == "-":
+        offset = -offset
+    tzinfo = _TZ_CACHE.get(offset)
+    if tzinfo is None:
+        tzinfo = _TZ_CACHE.setdefault(offset, timezone(timedelta(minutes=offset)))
+    return tzinfo
+
+
+def _has_fixed_shape(value: str) -> bool:
+    """Whether ``value`` is laid out as ``YYYY-MM-DD'T'hh:mm:ss[.f{1,6}]`` followed by ``Z``,
+    ``±hhmm`` or ``±hh:mm``, without checking the digits.
+
+    ``datetime.fromisoformat`` accepts a lot more than that (week dates, reduced precision,
+    ',' before the fraction, offsets with seconds, more than 6 fractional digits, ...), so it is
+    only trusted with strings of this shape.
+    """
+    length = len(value)
+    if (
+        length < 20
+        or value[4] != "-"
+        or value[7] != "-"
+        or value[10] != "T"
+        or value[13] != ":"
+        or value[16] != ":"
+    ):
+        return False
+
+    if value[-1] == "Z":
+        end = length - 1
+    elif value[-3] == ":":
+        end = length - 6
+    else:
+        end = length - 5
+    # fromisoformat takes offset minutes up to 99 and carries them into the hours
+    if end != length - 1 and (value[end] not in "+-" or value[-2] > "5"):
+        return False
+
+    if end == 19:
+        return True
+    return 21 <= end <= 26 and value[19] == "."
+
+
+# Parsed values are immutable and the same strings tend to repeat within and across payloads
+# (timestamps, IDs), so the parsers below are memoized. Failures raise and so aren't cached.
+
+
+@functools.lru_cache(maxsize=4096)
+def _parse_datetime(value: str) -> datetime:
+    """Parse any of the timestamp forms ``IsoDateTime`` accepts. Raises ``ValueError``."""
+    if _FROMISOFORMAT_ANY_OFFSET and _has_fixed_shape(value):
+        return datetime.fromisoformat(value)
+
+    match = _ISO_DATETIME_RE.fullmatch(value)
+    if match is None:
+        raise ValueError("Expected an ISO 8601 timestamp with a UTC offset")
+    year, month, day, hour, minute, second, frac, sign, tz_hours, tz_minutes = match.groups()
+    if sign is None:
+        tzinfo = _UTC
+    else:
+        tzinfo = _get_tz(sign, tz_hours, tz_minutes)
+    return datetime(
+        int(year),
+        int(month),
+        int(day),
+        int(hour),
+        int(minute),
+        int(second),
+        int(frac.ljust(6, "0")) if frac else 0,
+        tzinfo=tzinfo,
+    )
+
+
+@functools.lru_cache(maxsize=4096)
+def _parse_date(value: str) -> date:
+    """Parse a ``YYYY-MM-DD`` date. Raises ``ValueError``."""
+    if _HAS_FROMISOFORMAT and len(value) == 10 and value[4] == "-" and value[7] == "-":
+        return date.fromisoformat(value)
+
+    # other shapes (e.g. single digit months) have always been accepted by splitting, and are
+    # kept away from fromisoformat, which on Python 3.11+ also takes week dates and the like
+    split = value.split("-")
+    if len(split) != 3:
+        raise ValueError("Expected YYYY-MM-DD")
+    return date(*[int(x) for x in split])
+
+
+@functools.lru_cache(maxsize=4096)
+def _parse_uuid(value: str) -> UUID:
+    """Parse a UUID. Raises ``ValueError``."""
+    return UUID(value)
+
+
+@functools.lru_cache(maxsize=4096)
+def _format_datetime(value: datetime, offset, utc: bool) -> str:
+    """Format a naive timestamp the way ``IsoDateTime`` writes it, given its UTC offset.
+
+    Callers split an aware datetime into these parts because its ``tzinfo`` may not be hashable,
+    and because aware datetimes compare equal across timezones.
+    """
+    if utc:
+        return datetime.strftime(value, "%Y-%m-%dT%H:%M:%SZ")
+    if offset is not None:
+        value = value.replace(tzinfo=timezone(offset))
+    return datetime.strftime(value, "%Y-%m-%dT%H:%M:%S%z")
+
+
 class Field:
     """
     Base class for a field that should be de/serialized in a class.
@@ -117,7 +288,7 @@ class String(Field):
     """De/serialize a JSON string."""
 
     def from_json(self, value) -> str:
-        if not isinstance(value, str):
+        if type(value) is not str and not isinstance(value, str):
             raise SerdeError("Expected a string.")
         return value
 
@@ -129,7 +300,8 @@ class Integer(Field):
     """De/serialize a JSON number (integers only)."""
 
     def from_json(self, value) -> int:
-        if not isinstance(value, int):
+        # ``bool`` is a subclass of ``int``, but ``true``/``false`` are not JSON integers
+        if type(value) is not int and (not isinstance(value, int) or isinstance(value, bool)):
             raise SerdeError("Expected an integer.")
         return value
 
@@ -141,7 +313,8 @@ class Boolean(Field):
     """De/serialize a JSON boolean."""
 
     def from_json(self, value) -> bool:
-        if not isinstance(value, bool):
+        # ``bool`` can't be subclassed
+        if type(value) is not bool:
             raise SerdeError("Expected a boolean.")
         return value
 
@@ -153,11 +326,14 @@ class Float(Field):
     """De/serialize a JSON number (floats or ints)."""
 
     def from_json(self, value) -> float:
-        if not isinstance(value, float) and not isinstance(value, int):
-            raise SerdeError("Expected a number.")
-        if isinstance(value, int):
-            value = float(value)
-        return value
+        if type(value) is float:
+            return value
+        if type(value) is int:
+            return float(value)
+        # ``bool`` is a subclass of ``int``, but ``true``/``false`` are not JSON numbers
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            return float(value)
+        raise SerdeError("Expected a number.")
 
     def to_json(self, value: float) -> float:
         return value
@@ -174,36 +350,20 @@ class IsoDateTime(Field):
       - ``YYYY-MM-DD'T'hh:mm:ss±hh:mm``
     """
 
-    __FMT_STR_Z = "%Y-%m-%dT%H:%M:%SZ"
-    __FMT_STRS = ["%Y-%m-%dT%H:%M:%S%z", "%Y-%m-%dT%H:%M:%S.%f%z"]
-
     def to_json(self, value) -> str:
         if value is None:
             return None
-        if value.tzinfo is None:
-            value = value.replace(tzinfo=timezone.utc)
-        if value.tzinfo == timezone.utc:
-            return datetime.strftime(value, self.__FMT_STR_Z)
-        return datetime.strftime(value, self.__FMT_STRS[0])
+        tzinfo = value.tzinfo
+        utc = tzinfo is None or tzinfo == _UTC
+        return _format_datetime(value.replace(tzinfo=None), None if utc else value.utcoffset(), utc)
 
     def from_json(self, value: str) -> datetime:
         if not isinstance(value, str):
             raise SerdeError("Cannot parse as a date")
-        if value.endswith("Z"):
-            value = value[0:-1] + "+0000"
-        else:
-            if len(value) > 3 and value[-3] == ":":
-                value = value[0:-3] + value[-2:]
-
-        for fmt_str in self.__FMT_STRS:
-            try:
-                dt = datetime.strptime(value, fmt_str)
-                if dt.tzinfo is None:
-                    dt = dt.replace(tzinfo=timezone.utc)
-                return dt
-            except ValueError:
-                pass
-        raise SerdeError("Illegal date format.")
+        try:
+            return _parse_datetime(value)
+        except ValueError:
+            raise SerdeError("Illegal date format.")
 
 
 class IsoDate(Field):
@@ -219,10 +379,10 @@ class IsoDate(Field):
     def from_json(self, value: str) -> datetime:
         if not isinstance(value, str):
             raise SerdeError("Cannot parse as a date.")
-        split = value.split("-")
-        if len(split) != 3:
+        try:
+            return _parse_date(value)
+        except ValueError:
             raise SerdeError("Date had bad format.")
-        return date(*[int(x) for x in split])
 
 
 class Uuid(Field):
@@ -235,7 +395,7 @@ class Uuid(Field):
         if not isinstance(value, str):
             raise SerdeError("Cannot parse as a UUID.")
         try:
-            return UUID(value)
+            return _parse_uuid(value)
         except ValueError:
             raise SerdeError("UUID had bad format.")
 
@@ -253,12 +413,12 @@ class List(Field):
         self.typ = typ
 
     def to_json(self, value: list) -> list:
-        return [v.to_json() for v in value]
+        return list(map(_call_to_json, value))
 
     def from_json(self, value: list) -> list:
         if not isinstance(value, list):
             raise SerdeError("Expected a list.")
-        return [self.typ.from_json(v) for v in value]
+        return list(map(self.typ.from_json, value))
 
 
 class Nested(Field):
@@ -281,244 +441,372 @@ class Nested(Field):
         return self.typ.from_json(value)
 
 
+# ``to_json`` implementations that return the value unchanged, so generated code can skip the call
+_PASSTHROUGH_TO_JSON = frozenset(
+    [
+        Anything.to_json,
+        Dict.to_json,
+        String.to_json,
+        Integer.to_json,
+        Boolean.to_json,
+        Float.to_json,
+    ]
+)
+
+
 class JsonSerdeMeta(type):
     def __new__(mcs, name, bases, attrs):
         fields = []
-        out = OrderedDict()
+        out = {}
+        last_counter = -1
+        in_order = True
 
         for attr, value in attrs.items():
             if isinstance(value, Field):
                 fields.append((attr, value))
+                in_order = in_order and value.counter > last_counter
+                last_counter = value.counter
             else:
                 out[attr] = value
 
-        fields = OrderedDict(sorted(fields, key=lambda kv: kv[1].counter))
-
+        # the class body is normally already in field creation order, but a field created
+        # elsewhere (e.g. shared between classes) may not be
+        if not in_order:
+            fields.sort(key=lambda kv: kv[1].counter)
+
+        # (attribute name, JSON key, field), with the JSON key resolved and interned once here
+        # rather than on the field, since a field instance may be shared between classes
+        fields = tuple((attr, sys.intern(field.rename or attr), field) for attr, field in fields)
+        out["__json_serde_fields__"] = fields
+
+        # instances only hold their field values (plus any slots the class body asks for)
+        slots = attrs.get("__slots__", ())
+        if isinstance(slots, str):
+            slots = (slots,)
+        slots = tuple(slots) + tuple(attr for attr, _, _ in fields)
+        # the root class makes instances weak-referenceable; a subclass asking for it again would
+        # be an error
+        slots = tuple(slot for slot in slots if slot != "__weakref__")
+        if not any(hasattr(base, "__weakref__") for base in bases):
+            slots += ("__weakref__",)
+        out["__slots__"] = slots
+
+        get_values = JsonSerdeMeta.mk_get_values(fields)
         out["__init__"] = JsonSerdeMeta.mk_init(fields)
         out["to_json"] = JsonSerdeMeta.mk_to_json(fields)
         out["from_json"] = JsonSerdeMeta.mk_from_json(fields)
-        out["__eq__"] = JsonSerdeMeta.mk_eq(fields)
+        out["__eq__"] = JsonSerdeMeta.mk_eq(get_values)
         out["__ne__"] = lambda s, o: not s.__eq__(o)
-        out["__hash__"] = JsonSerdeMeta.mk_hash(fields)
+        out["__hash__"] = JsonSerdeMeta.mk_hash(get_values)
         out["__repr__"] = JsonSerdeMeta.mk_repr(name, fields)
-        if fields:
-            out["__validate"] = JsonSerdeMeta.mk_validate(fields)
         return type.__new__(mcs, name, bases, out)
 
     @staticmethod
-    def mk_init(fields: OrderedDict) -> callable:
-        slf = "self"
-        if fields:
-            slf += ", "
-        args = []
+    def mk_init(fields: tuple) -> callable:
+        args = ["self"]
         init_lines = []
-        default_map = {}
+        validate_lines = []
+        variables = {
+            "Absent": Absent,
+            "SerdeError": SerdeError,
+            "__missing__": object(),
+        }
+        seen_optional = False
 
-        for name, field in fields.items():
-            keyword = name
-            if field.is_optional:
-                keyword += "=None"
-            args.append(keyword)
+        for idx, (name, key, field) in enumerate(fields):
             if field.is_optional:
+                seen_optional = True
+                args.append("{}=None".format(name))
+                default = "__default_{}".format(idx)
                 if field.default is not Absent:
-                    default = field.default
-                    set_default = '__default_map__["{name}"]'.format(name=name)
+                    variables[default] = field.default
+                    set_default = default
                 elif field.default_factory is not None:
-                    default = field.default_factory
-                    set_default = '__default_map__["{name}"]()'.format(name=name)
+                    variables[default] = field.default_factory
+                    set_default = default + "()"
                 else:
-                    default = None
-                    set_default = name
-
-                default_map[name] = default
+                    set_default = None
+
+                if set_default is not None:
+                    lines = (
+                        "    if {name} is Absent or {name} is None:\n"
+                        "        {name} = {set_default}"
+                    )
+                    init_lines.append(lines.format(name=name, set_default=set_default))
+            else:
+                if seen_optional:
+                    # a required field declared after an optional one can't be a plain positional
+                    args.append("{}=__missing__".format(name))
+                    lines = (
+                        "    if {name} is __missing__:\n"
+                        '        raise TypeError("__init__() missing required argument: {name!r}")'
+                    )
+                    init_lines.append(lines.format(name=name))
+                else:
+                    args.append(name)
 
                 lines = (
-                    "    if {name} is Absent or {name} is None:\n"
-                    "        self.{name} = {set_default}\n"
-                    "    else:\n"
-                    "        self.{name} = {name}\n"
+                    "    if {name} is None or {name} is Absent:\n        raise SerdeError({msg!r})"
                 )
-                init_lines.append(lines.format(name=name, set_default=set_default))
-            else:
-                init_lines.append("    self.{name} = {name}".format(name=name))
-
-        args = ", ".join(args)
-        init_lines.insert(0, "def __init__({}{}) -> None:".format(slf, args))
+                msg = "Field {!r} is required.".format(key)
+                init_lines.append(lines.format(name=name, msg=msg))
+
+            init_lines.append("    self.{name} = {name}".format(name=name))
+
+            if field.validators:
+                # validators run once every field is set, since they may look at other fields
+                validate_lines.append("    try:")
+                for v_idx, validator in enumerate(field.validators):
+                    var = "__validator_{}_{}".format(idx, v_idx)
+                    variables[var] = validator
+                    validate_lines.append("        {}(self, {})".format(var, name))
+                validate_lines.append("    except SerdeError as e:")
+                prefix = "Field {!r}: ".format(key)
+                validate_lines.append("        raise SerdeError({!r} + str(e))".format(prefix))
+
+        init_lines.insert(0, "def __init__({}) -> None:".format(", ".join(args)))
+        init_lines.extend(validate_lines)
         if not fields:
             init_lines.append("    pass")
-        else:
-            init_lines.append("    self.__validate()")
+        return _compile_function("__init__", "init", init_lines, variables)
 
-        init = "\n".join(init_lines)
-        sha = hashlib.sha1()  # nosec
-        sha.update(init_lines[0].encode("utf-8"))
-        filename = "<json_serde init {}>".format(sha.hexdigest())
+    @staticmethod
+    def mk_get_values(fields: tuple) -> callable:
+        """Make a function returning the tuple of an instance's field values, in field order."""
+        names = [name for name, _, _ in fields]
+        if len(names) > 1:
+            return operator.attrgetter(*names)
+        if names:
+            # attrgetter with a single name returns the bare value
+            getter = operator.attrgetter(names[0])
+            return lambda self: (getter(self),)
+        return lambda self: ()
+
+    @staticmethod
+    def mk_to_json(fields: tuple) -> callable:
+        to_json_lines = ["def to_json(self) -> dict:", "    out = {}"]
+        variables = {"Absent": Absent}
+
+        for idx, (attr, key, field) in enumerate(fields):
+            to_json = type(field).to_json
+            if to_json in _PASSTHROUGH_TO_JSON:
+                encode = "{}"
+            else:
+                encoder = "__encode_{}".format(idx)
+                if to_json is Uuid.to_json:
+                    variables[encoder] = str
+                elif to_json is Nested.to_json:
+                    # only ever called with a value that isn't None
+                    variables[encoder] = _call_to_json
+                else:
+                    variables[encoder] = field.to_json
+                encode = encoder + "({})"
+
+            # required fields are checked by __init__, but may still be reassigned afterwards, so
+            # they get the same guard as optional fields (which they can't set write_* on)
+            lines = ["    v = self.{attr}"]
+            if field.write_null and field.write_absent:
+                lines.append("    out[{key!r}] = None if v is None or v is Absent else {value}")
+            elif field.write_null:
+                lines.append("    if v is None:")
+                lines.append("        out[{key!r}] = None")
+                lines.append("    elif v is not Absent:")
+                lines.append("        out[{key!r}] = {value}")
+            elif field.write_absent:
+                lines.append("    if v is Absent:")
+                lines.append("        out[{key!r}] = None")
+                lines.append("    elif v is not None:")
+                lines.append("        out[{key!r}] = {value}")
+            else:
+                lines.append("    if v is not None and v is not Absent:")
+                lines.append("        out[{key!r}] = {value}")
+            value = encode.format("v")
+            to_json_lines.extend(line.format(attr=attr, key=key, value=value) for line in lines)
 
-        locs = {}
+        to_json_lines.append("    return out")
+        return _compile_function("to_json", "to_json", to_json_lines, variables)
+
+    @staticmethod
+    def mk_from_json(fields: tuple) -> callable:
+        from_json_lines = ["def from_json(cls, value):"]
+        nargs = []
+        kwargs = []
         variables = {
             "Absent": Absent,
-            "__default_map__": default_map,
+            "Mapping": Mapping,
+            "SerdeError": SerdeError,
         }
-        bytecode = compile("\n".join(init_lines), filename, "exec")
-        eval(bytecode, variables, locs)  # nosec
-
-        linecache.cache[filename] = (
-            len(init),
-            None,
-            init_lines,
-            filename,
-        )
+        positional = True
 
-        return locs["__init__"]
+        required = [
+            (idx, key) for idx, (_, key, field) in enumerate(fields) if not field.is_optional
+        ]
+        if required:
+            # required keys are read from a dict by subscripting, which is cheaper than get();
+            # other mappings use get() so that e.g. a defaultdict's __missing__ isn't called
+            from_json_lines.append("    if type(value) is dict:")
+            from_json_lines.append("        try:")
+            from_json_lines.extend(
+                "            v{} = value[{!r}]".format(idx, key) for idx, key in required
+            )
+            from_json_lines.append("        except KeyError as e:")
+            from_json_lines.append(
+                "            raise SerdeError('Field {!r} is required.'.format(e.args[0]))"
+            )
+            from_json_lines.append("    elif isinstance(value, Mapping):")
+            for idx, key in required:
+                from_json_lines.append("        v{} = value.get({!r}, Absent)".format(idx, key))
+                from_json_lines.append("        if v{} is Absent:".format(idx))
+                from_json_lines.append(
+                    "            raise SerdeError({!r})".format(
+                        "Field {!r} is required.".format(key)
+                    )
+                )
+            from_json_lines.append("    else:")
+        else:
+            from_json_lines.append(
+                "    if type(value) is not dict and not isinstance(value, Mapping):"
+            )
+        from_json_lines.append("        raise SerdeError('Expected an object.')")
+
+        for idx, (name, key, field) in enumerate(fields):
+            var = "v{}".format(idx)
+            decoder = "__decode_{}".format(idx)
+            if field.is_optional:
+                lines = ["    {var} = value.get({key!r}, Absent)"]
+            else:
+                lines = []
 
-    @staticmethod
-    def mk_to_json(fields: OrderedDict) -> callable:
-        def to_json(self) -> dict:
-            out = {}
-            for name, field in fields.items():
-                val = getattr(self, name)
-                rename = field.rename or name
-                if val is None:
-                    if field.write_null:
-                        out[rename] = None
-                elif val is Absent:
-                    if field.write_absent:
-                        out[rename] = None
+            if field.is_optional or isinstance(field, Nested):
+                # a null required nested object is left for __init__ to reject
+                if isinstance(field, Nested):
+                    variables[decoder] = field.typ.from_json
                 else:
-                    val = field.to_json(val)
-                    out[rename] = val
-            return out
-
-        return to_json
+                    variables[decoder] = field.from_json
+                lines += [
+                    "    if {var} is not None and {var} is not Absent:",
+                    "        try:",
+                    "            {var} = {decoder}({var})",
+                    "        except SerdeError as e:",
+                    "            raise SerdeError({prefix!r} + str(e))",
+                ]
+            elif isinstance(field, List):
+                variables[decoder] = field.typ.from_json
+                lines += [
+                    "    if type({var}) is not list and not isinstance({var}, list):",
+                    "        raise SerdeError({prefix!r} + 'Expected a list.')",
+                    "    try:",
+                    "        {var} = [",
+                    "            {decoder}(x) if x is not None and x is not Absent else x",
+                    "            for x in {var}",
+                    "        ]",
+                    "    except SerdeError as e:",
+                    "        raise SerdeError({prefix!r} + str(e))",
+                ]
+            else:
+                variables[decoder] = field.from_json
+                lines += [
+                    "    try:",
+                    "        {var} = {decoder}({var})",
+                    "    except SerdeError as e:",
+                    "        raise SerdeError({prefix!r} + str(e))",
+                ]
+
+            prefix = "Field {!r}: ".format(key)
+            from_json_lines.extend(
+                line.format(var=var, key=key, decoder=decoder, prefix=prefix) for line in lines
+            )
+
+            # required fields can only be passed positionally until the first optional one
+            positional = positional and not field.is_optional
+            if positional:
+                nargs.append(var)
+            else:
+                kwargs.append("{}={}".format(name, var))
 
-    @staticmethod
-    def mk_from_json(fields: OrderedDict) -> callable:
-        def from_json(cls, value):
-            nargs = []
-            kwargs = {}
-
-            for name, field in fields.items():
-                rename = field.rename or name
-                if rename not in value:
-                    val = Absent
-                else:
-                    val = value[rename]
-
-                if field.is_optional:
-                    if val is not None and val is not Absent:
-                        try:
-                            kwargs[name] = field.from_json(val)
-                        except SerdeError as e:
-                            raise SerdeError("Field {!r}: {}".format(rename, e))
-                    else:
-                        kwargs[name] = val
-                else:
-                    if isinstance(field, Nested):
-                        if val is not None or val is not Absent:
-                            try:
-                                val = field.typ.from_json(val)
-                            except SerdeError as e:
-                                raise SerdeError("Field {!r}: {}".format(rename, e))
-                    elif isinstance(field, List):
-                        if not isinstance(val, list):
-                            raise SerdeError("Field {!r}: Expected a list.")
-
-                        def parser(v):
-                            if v is not None and v is not Absent:
-                                try:
-                                    return field.typ.from_json(v)
-                                except SerdeError as e:
-                                    raise SerdeError("Field {!r}: {}".format(rename, e))
-                            else:
-                                return v
-
-                        val = [parser(v) for v in val]
-                    else:
-                        try:
-                            val = field.from_json(val)
-                        except SerdeError as e:
-                            raise SerdeError("Field {!r}: {}".format(rename, e))
-                    nargs.append(val)
-
-            return cls(*nargs, **kwargs)
-
-        return classmethod(from_json)
+        from_json_lines.append("    return cls({})".format(", ".join(nargs + kwargs)))
+        return classmethod(_compile_function("from_json", "from_json", from_json_lines, variables))
 
     @staticmethod
-    def mk_eq(fields: OrderedDict) -> callable:
+    def mk_eq(get_values: callable) -> callable:
         def __eq__(self, other) -> bool:
-            if not isinstance(other, self.__class__):
-                return False
-            for name in fields.keys():
-                if getattr(self, name) != getattr(other, name):
-                    return False
-            return True
+            # the fields of a subclass are its own, so only instances of the same class compare
+            return type(self) is type(other) and get_values(self) == get_values(other)
 
         return __eq__
 
     @staticmethod
-    def mk_hash(fields: OrderedDict) -> callable:
-        getters = [
-            "frozenset(self.{k}) if isinstance(self.{k}, list) else self.{k}".format(k=k)
-            for k in fields.keys()
-        ]
-        hash_lines = [
-            "def __hash__(self) -> int:",
-            "    return hash(({}))".format(", ".join(getters)),
-        ]
-
-        sha = hashlib.sha1()  # nosec
-        sha.update((",".join([k for k in fields.keys()]).encode("utf-8")))
-        filename = "<json_serde hash {}>".format(sha.hexdigest())
+    def mk_hash(get_values: callable) -> callable:
+        def __hash__(self) -> int:
+            return hash(tuple(frozenset(v) if isinstance(v, list) else v for v in get_values(self)))
 
-        hash_ = "\n".join(hash_lines)
-        locs = {}
-        bytecode = compile(hash_, filename, "exec")
-        eval(bytecode, {}, locs)  # nosec
+        return __hash__
 
-        linecache.cache[filename] = (
-            len(hash_),
-            None,
-            hash_lines,
-            filename,
-        )
+    @staticmethod
+    def mk_repr(name: str, fields: tuple) -> callable:
+        parts = ["<", name]
+        for attr, key, _ in fields:
+            parts.append(
+                " {}={{self.{}!r}}".format(key.replace("{", "{{").replace("}", "}}"), attr)
+            )
+        parts.append(">")
+
+        repr_lines = [
+            "def __repr__(self) -> str:",
+            "    return f{!r}".format("".join(parts)),
+        ]
+        return _compile_function("__repr__", "repr", repr_lines, {})
 
-        return locs["__hash__"]
 
-    @staticmethod
-    def mk_validate(fields: OrderedDict) -> callable:
-        def __validate(self) -> None:
-            for name, field in fields.items():
-                rename = field.rename or name
-                value = getattr(self, name)
-                if value is None or value is Absent:
-                    if not field.is_optional:
-                        raise SerdeError("Field {!r} is required.".format(rename))
-                for validator in field.validators:
-                    try:
-                        validator(self, value)
-                    except SerdeError as e:
-                        raise SerdeError("Field {!r}: {}".format(rename, e))
-
-        return __validate
+class JsonSerde(metaclass=JsonSerdeMeta):
 
-    @staticmethod
-    def mk_repr(name: str, fields: OrderedDict) -> callable:
-        def __repr__(self) -> str:
-            if not fields:
-                return "<{}>".format(name)
-            out = ["<{}".format(name)]
-            for f_name, field in fields.items():
-                f_name = field.rename or f_name
-                out.append(" {}={!r}".format(f_name, getattr(self, f_name)))
-            out.append(">")
-            return "".join(out)
+    """Base class for all classes that implement auto JSON de/serialization.
 
-        return __repr__
+    The fields of a subclass are available, in the order they were created, as
+    ``__json_serde_fields__``, a tuple of ``(attribute name, JSON key, field)``.
 
+    Subclasses get ``__slots__`` for their fields, so instances have no ``__dict__``. A subclass
+    that needs to store other attributes on its instances must list them in its own
+    ``__slots__``. Because of the slots, a class can't inherit from two ``JsonSerde`` classes
+    that both have fields.
+    """
 
-class JsonSerde(metaclass=JsonSerdeMeta):
+    def __getstate__(self) -> dict:
+        # a base class without __slots__ (e.g. a mixin) gives instances a __dict__ as well
+        state = dict(getattr(self, "__dict__", {}))
+        for klass in type(self).__mro__:
+            for slot in klass.__dict__.get("__slots__", ()):
+                if slot == "__weakref__":
+                    continue
+                if slot.startswith("__") and not slot.endswith("__"):
+                    slot = "_{}{}".format(klass.__name__.lstrip("_"), slot)
+                if hasattr(self, slot):
+                    state[slot] = getattr(self, slot)
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        for name, value in state.items():
+            setattr(self, name, value)
+
+    @classmethod
+    def from_json_bytes(cls, value):
+        """Parse a JSON document (``bytes`` or ``str``) and deserialize it into this class.
+
+        Uses ``orjson`` for the parsing if it is installed.
+        """
+        try:
+            value = loads(value)
+        except ValueError:
+            # both backends' decode errors (and ``UnicodeDecodeError``) are ``ValueError``s
+            raise SerdeError("Invalid JSON.")
+        return cls.from_json(value)
 
-    """Base class for all classes that implement auto JSON de/serialization."""
+    def to_json_bytes(self) -> bytes:
+        """Serialize this object to a UTF-8 encoded JSON document.
 
-    pass
+        Uses ``orjson`` for the encoding if it is installed. Its output can differ from the
+        standard library's for values held by ``Dict`` and ``Anything`` fields: ``orjson`` writes
+        NaN and infinities as ``null``, raises ``TypeError`` for integers that don't fit in 64
+        bits, and formats some floats differently (e.g. ``1e16`` instead of ``1e+16``).
+        """
+        return dumps(self.to_json())
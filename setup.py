@@ -1,4 +1,5 @@
 import json_serde
+import os
 import setuptools
 
 from os import path
@@ -8,6 +9,18 @@ base_dir = path.abspath(path.dirname(__file__))
 with open(path.join(base_dir, 'README.md')) as f:
     long_description = f.read()
 
+# Opt-in: compile json_serde/serde.py with Cython. The pure Python module is still installed and
+# is used wherever the extension isn't built.
+ext_modules = []
+if os.environ.get('JSON_SERDE_CYTHON'):
+    from Cython.Build import cythonize
+    ext_modules = cythonize(
+        ['json_serde/serde.py'],
+        # annotations document the Python API; they aren't C types (``typ: type`` is passed
+        # JsonSerdeMeta classes, for one)
+        compiler_directives={'language_level': 3, 'annotation_typing': False},
+    )
+
 setuptools.setup(
     name='json-serde',
     version=json_serde.__version__,
@@ -19,6 +32,10 @@ setuptools.setup(
     long_description_content_type='text/markdown',
     package_dir={'json_serde': 'json_serde'},
     packages=['json_serde'],
+    ext_modules=ext_modules,
+    extras_require={
+        'orjson': ['orjson'],
+    },
     platforms='any',
     python_requires='>=3.4',
     classifiers=(
@@ -11,3 +11,6 @@ def test_absent():
 
     assert repr(Absent) == "Absent"
     assert str(Absent) == "Absent"
+
+    assert not hasattr(Absent, "__dict__")
+    assert Absent.__doc__ == AbsentType.__doc__
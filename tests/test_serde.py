@@ -1,8 +1,15 @@
+import copy
+import json
+import pickle
 import pytest
+import weakref
 
-from datetime import datetime, timezone, date
+from collections import OrderedDict, defaultdict
+from datetime import datetime, timedelta, timezone, tzinfo, date
+from types import MappingProxyType
 from uuid import UUID
 
+from json_serde import serde
 from json_serde.serde import (
     Anything,
     Dict,
@@ -75,6 +82,15 @@ def test_string():
     with pytest.raises(SerdeError):
         Foo.from_json({"bar": 123})
 
+    class Upper(String):
+        def to_json(self, value: str) -> str:
+            return value.upper()
+
+    class Bar(JsonSerde):
+        bar = Upper()
+
+    assert Bar("bar").to_json() == {"bar": "BAR"}
+
 
 def test_int():
     class Foo(JsonSerde):
@@ -88,6 +104,9 @@ def test_int():
     with pytest.raises(SerdeError):
         Foo.from_json({"bar": "1312"})
 
+    with pytest.raises(SerdeError):
+        Foo.from_json({"bar": True})
+
 
 def test_boolean():
     class Foo(JsonSerde):
@@ -119,6 +138,9 @@ def test_float():
     with pytest.raises(SerdeError):
         Foo.from_json({"bar": "123"})
 
+    with pytest.raises(SerdeError):
+        Foo.from_json({"bar": False})
+
 
 def test_uuid():
     class Foo(JsonSerde):
@@ -174,6 +196,55 @@ def test_datetime():
     bar = Bar(datetime(2018, 1, 1, 0, 0, 0, 0))
     assert bar.to_json()["baz"] == "2018-01-01T00:00:00Z"
 
+    # non-UTC offsets and fractional seconds
+    tz = timezone(timedelta(hours=-5, minutes=-30))
+    bar = Bar(datetime(2018, 1, 1, 12, 30, 15, 250000, tz))
+    for dt in ["2018-01-01T12:30:15.25-0530", "2018-01-01T12:30:15.250000-05:30"]:
+        assert Bar.from_json({"baz": dt}) == bar
+        assert Bar.from_json({"baz": dt}).baz.utcoffset() == tz.utcoffset(None)
+
+    # looser shapes
+    bar = Bar(datetime(2018, 1, 2, 3, 4, 5, 600000, timezone.utc))
+    for dt in ["2018-1-2T3:4:5.6Z", "2018-1-02T03:04:05.6+00:00", "2018-01-2T3:04:05.6+0000"]:
+        assert Bar.from_json({"baz": dt}) == bar
+
+    # the same instant in another timezone keeps its own offset
+    bar = Bar(datetime(2018, 1, 1, 1, 0, 0, 0, timezone(timedelta(hours=1))))
+    assert bar.baz == foo.bar
+    assert bar.to_json()["baz"] == "2018-01-01T01:00:00+0100"
+
+    # tzinfo implementations aren't necessarily hashable
+    class EqOnlyTz(tzinfo):
+        def __init__(self, hours):
+            self.hours = hours
+
+        def __eq__(self, other):
+            return isinstance(other, EqOnlyTz) and other.hours == self.hours
+
+        def utcoffset(self, dt):
+            return timedelta(hours=self.hours)
+
+    bar = Bar(datetime(2018, 1, 1, 0, 0, 0, 0, EqOnlyTz(0)))
+    assert bar.to_json()["baz"] == "2018-01-01T00:00:00+0000"
+    bar = Bar(datetime(2018, 1, 1, 0, 0, 0, 0, EqOnlyTz(-2)))
+    assert bar.to_json()["baz"] == "2018-01-01T00:00:00-0200"
+
+    for dt in [
+        "2018-13-01T00:00:00Z",
+        "2018-01-01T00:00Z",
+        "2018-01-01T00Z",
+        "2018-W01-1T00:00:00Z",
+        "2018-01-01T00:00:00,5Z",
+        "2018-01-01T00:00:00+00:00:30",
+        "2018-01-01T000000Z",
+        "2018-01-01T00:00:00.5+05",
+        "2018-01-01T00:00:00.1234567Z",
+        "2018-01-01T00:00:00+05:99",
+        "2018-01-01T00:00:00+0060",
+    ]:
+        with pytest.raises(SerdeError):
+            Foo.from_json({"bar": dt})
+
 
 def test_validator():
     MSG = "NOT MORE THAN THREE"
@@ -192,13 +263,43 @@ def test_validator():
         Foo(2)
     assert str(e.value) == "Field 'bar': {}".format(MSG)
 
+    def less_than_baz(self, x) -> None:
+        if x >= self.baz:
+            raise SerdeError(MSG)
+
+    class Bar(JsonSerde):
+        bar = Integer(validators=[more_than_three, less_than_baz], rename="qux")
+        baz = Integer()
+
+    assert Bar(4, 5).bar == 4
+
+    with pytest.raises(SerdeError) as e:
+        Bar(5, 5)
+    assert str(e.value) == "Field 'qux': {}".format(MSG)
+
 
 def test_optional():
     class Foo(JsonSerde):
         foo = String()
 
-    with pytest.raises(SerdeError):
+    with pytest.raises(SerdeError) as e:
         Foo(None)
+    assert str(e.value) == "Field 'foo' is required."
+
+    with pytest.raises(SerdeError) as e:
+        Foo.from_json({})
+    assert str(e.value) == "Field 'foo' is required."
+
+    # a defaultdict's default isn't used for missing keys
+    value = defaultdict(str)
+    with pytest.raises(SerdeError) as e:
+        Foo.from_json(value)
+    assert str(e.value) == "Field 'foo' is required."
+    assert value == {}
+
+    with pytest.raises(SerdeError) as e:
+        Foo.from_json(OrderedDict())
+    assert str(e.value) == "Field 'foo' is required."
 
     class Foo(JsonSerde):
         foo = String(is_optional=True)
@@ -233,8 +334,49 @@ def test_list():
         "foo": {"bar": "wat"},
     }
 
-    with pytest.raises(SerdeError):
+    with pytest.raises(SerdeError) as e:
         Foo.from_json(out)
+    assert str(e.value) == "Field 'foo': Expected a list."
+
+    class Items(list):
+        pass
+
+    class Baz(JsonSerde):
+        foo = List(Bar, is_optional=True)
+
+    for cls in (Foo, Baz):
+        assert cls.from_json({"foo": Items([{"bar": "wat"}])}).foo == [Bar("wat")]
+
+
+def test_from_json_bytes(monkeypatch):
+    class Bar(JsonSerde):
+        bar = String()
+
+    class Foo(JsonSerde):
+        foo = List(Bar)
+
+    foo = Foo([Bar("wat"), Bar("lol")])
+    assert Foo.from_json_bytes(b'{"foo": [{"bar": "wat"}, {"bar": "lol"}]}') == foo
+    assert Foo.from_json_bytes('{"foo": [{"bar": "wat"}, {"bar": "lol"}]}') == foo
+
+    with pytest.raises(SerdeError):
+        Foo.from_json_bytes(b'{"foo": {"bar": "wat"}}')
+
+    assert Foo.from_json_bytes(foo.to_json_bytes()) == foo
+    assert json.loads(foo.to_json_bytes()) == foo.to_json()
+
+    # with orjson and with the standard library
+    for loads in (serde.loads, json.loads):
+        monkeypatch.setattr(serde, "loads", loads)
+        for value in (b"{", b"\xff"):
+            with pytest.raises(SerdeError) as e:
+                Foo.from_json_bytes(value)
+            assert str(e.value) == "Invalid JSON."
+
+    class Baz(JsonSerde):
+        baz = Dict()
+
+    assert json.loads(Baz({1: "wat"}).to_json_bytes()) == {"baz": {"1": "wat"}}
 
 
 def test_nested():
@@ -256,6 +398,17 @@ def test_nested():
     assert foo.to_json() == out
     assert Foo.from_json(out) == foo
 
+    with pytest.raises(SerdeError) as e:
+        Foo.from_json({"bar": "baz"})
+    assert str(e.value) == "Field 'bar': Expected an object."
+
+    assert Foo.from_json(MappingProxyType({"bar": MappingProxyType({"baz": "baz"})})) == foo
+
+    for value in ({}, {"bar": None}):
+        with pytest.raises(SerdeError) as e:
+            Foo.from_json(value)
+        assert str(e.value) == "Field 'bar' is required."
+
 
 def test_rename():
     class Foo(JsonSerde):
@@ -275,6 +428,12 @@ def test_repr():
     foo = Foo("wat")
     repr(foo)
 
+    class Foo(JsonSerde):
+        wat = String(rename="bar")
+        baz = Integer()
+
+    assert repr(Foo("wat", 1)) == "<Foo bar='wat' baz=1>"
+
     class Foo(JsonSerde):
         pass
 
@@ -288,6 +447,55 @@ def test_hash():
 
     foo = Foo("wat")
     assert isinstance(hash(foo), int)
+    assert hash(foo) == hash(Foo("wat"))
+
+    class Bar(JsonSerde):
+        lol = List(Integer)
+
+    bar = Bar([1, 2])
+    assert hash(bar) == hash(bar) == hash(Bar([2, 1]))
+
+    # the hash follows changes to the fields, so equal instances keep equal hashes
+    foo.wat = "lol"
+    assert foo == Foo("lol")
+    assert hash(foo) == hash(Foo("lol"))
+
+    bar.lol.append(3)
+    assert hash(bar) == hash(Bar([1, 2, 3]))
+
+
+class Pickled(JsonSerde):
+    wat = String()
+    lol = Integer(is_optional=True)
+
+
+class Mixin:
+    pass
+
+
+class PickledMixin(JsonSerde, Mixin):
+    wat = String()
+
+
+def test_pickle():
+    foo = Pickled("wat")
+
+    for protocol in range(pickle.HIGHEST_PROTOCOL + 1):
+        loaded = pickle.loads(pickle.dumps(foo, protocol))
+        assert loaded == foo
+        assert hash(loaded) == hash(foo)
+
+    mixed = PickledMixin("wat")
+    mixed.extra = "lol"
+
+    for protocol in range(pickle.HIGHEST_PROTOCOL + 1):
+        loaded = pickle.loads(pickle.dumps(mixed, protocol))
+        assert loaded == mixed
+        assert loaded.extra == "lol"
+
+    copied = copy.copy(mixed)
+    assert copied == mixed
+    assert copied.extra == "lol"
 
 
 def test_eq():
@@ -302,6 +510,12 @@ def test_eq():
     assert f1 != f3
     assert f1 != "bad type"
 
+    class Bar(Foo):
+        wat = String()
+
+    assert f1 != Bar("123")
+    assert Bar("123") != f1
+
 
 def test_field_counter():
     f1 = String()
@@ -332,6 +546,16 @@ def test_field_counter():
         assert hash(f1) == hash(f2)
         assert repr(f1) == repr(f2)
 
+    # fields are ordered by creation, not by where they appear in the class body
+    shared = String()
+
+    class Bar(JsonSerde):
+        b = String()
+        a = shared
+
+    assert repr(Bar("a", "b")) == "<Bar a='a' b='b'>"
+    assert [(attr, key) for attr, key, _ in Bar.__json_serde_fields__] == [("a", "a"), ("b", "b")]
+
 
 def test_field():
     f = Field()
@@ -345,6 +569,22 @@ def test_field():
     repr(f)
 
 
+def test_required_reassigned():
+    class Bar(JsonSerde):
+        baz = String()
+
+    class Foo(JsonSerde):
+        s = String()
+        u = Uuid()
+        n = Nested(Bar)
+
+    foo = Foo("s", UUID("a629f931-0463-4b66-b9f3-f66b48deebb0"), Bar("baz"))
+    foo.s = Absent
+    foo.u = None
+    foo.n = None
+    assert foo.to_json() == {}
+
+
 def test_write_null():
     with pytest.raises(ValueError):
         Field(is_optional=False, write_null=True)
@@ -361,6 +601,13 @@ def test_write_null():
     b = Bar(wat=None)
     assert "wat" not in b.to_json()
 
+    class Baz(JsonSerde):
+        wat = Uuid(is_optional=True, write_null=True, write_absent=True)
+        lol = String()
+
+    assert Baz(wat=None, lol="lol").to_json() == {"wat": None, "lol": "lol"}
+    assert Baz(wat=Absent, lol="lol").to_json() == {"wat": None, "lol": "lol"}
+
 
 def test_iso_date():
     class Foo(JsonSerde):
@@ -371,6 +618,10 @@ def test_iso_date():
     assert foo.to_json() == out
     assert Foo.from_json(out) == foo
 
+    for bad in ["2018-01", "2018-13-01", "2018-01-xx"]:
+        with pytest.raises(SerdeError):
+            Foo.from_json({"bar": bad})
+
 
 def test_nested_none():
     """Regression test for #2"""
@@ -428,3 +679,56 @@ def test_default():
 
     foo = Foo()
     assert foo.wat == default()
+
+
+def test_init_args():
+    class Foo(JsonSerde):
+        bar = String()
+        baz = String(is_optional=True)
+
+    assert Foo("bar").baz is None
+    assert Foo(baz="baz", bar="bar") == Foo("bar", "baz")
+
+    with pytest.raises(TypeError):
+        Foo()
+
+    with pytest.raises(TypeError):
+        Foo("bar", "baz", "qux")
+
+    with pytest.raises(TypeError):
+        Foo("bar", bar="bar")
+
+    with pytest.raises(TypeError):
+        Foo("bar", qux="qux")
+
+
+def test_required_after_optional():
+    class Foo(JsonSerde):
+        bar = String(is_optional=True)
+        baz = String()
+
+    foo = Foo(baz="baz")
+    assert foo.bar is None
+    assert foo.baz == "baz"
+    assert Foo.from_json({"bar": None, "baz": "baz"}) == foo
+
+    with pytest.raises(TypeError):
+        Foo()
+
+
+def test_slots():
+    class Foo(JsonSerde):
+        __slots__ = ("cache",)
+
+        wat = String()
+
+    foo = Foo("wat")
+    assert not hasattr(foo, "__dict__")
+
+    foo.cache = 123
+    assert foo.cache == 123
+
+    with pytest.raises(AttributeError):
+        foo.lol = "lol"
+
+    assert weakref.ref(foo)() is foo